@@ -0,0 +1,105 @@
+"""
+Benchmark do micro-batching do /ml/predict (em processo, sem HTTP nem banco).
+
+Treina um modelo sintético, injeta no `model_cache` e dispara `--concurrency`
+clientes chamando `ml_predict` com e sem PREDICT_MICROBATCH. Imprime JSON com
+p50/p99 (ms) e throughput (req/s) de cada modo. Sem micro-batching a chamada
+não cede o event loop, então a latência inline não inclui fila no loop.
+
+    python bench_microbatch.py --requests 5000 --concurrency 64
+    python bench_microbatch.py --pipeline     # força o caminho DataFrame + Pipeline
+"""
+import argparse, asyncio, json, time, warnings
+
+import numpy as np
+import pandas as pd
+
+import app as reco
+
+SERVICES = ["LICENCIAMENTO", "TRANSFERENCIA", "VISTORIA", "EMISSAO_CRLV", "PLACA_MOTO", "DESBLOQUEIOS"]
+TIPOS = ["Cliente Final", "Empresa", "Revenda"]
+
+def synthetic_examples(n: int, seed: int = 0) -> tuple[pd.DataFrame, np.ndarray]:
+    """Frame com as colunas do dataset.csv + targets."""
+    rng = np.random.default_rng(seed)
+    hist = rng.poisson(0.4, size=(n, len(SERVICES)))
+    X = pd.DataFrame({
+        "tipo_cliente": np.array(TIPOS, dtype=object)[rng.integers(0, len(TIPOS), n)],
+        "total_servicos_cliente": hist.sum(axis=1),
+        "valor_total_gasto": np.round(hist.sum(axis=1) * rng.uniform(80, 400, n), 2),
+        "dias_desde_ultimo_servico": rng.integers(0, 2000, n),
+        "servicos_unicos_utilizados": (hist > 0).sum(axis=1),
+        "idade_veiculo": rng.integers(0, 35, n),
+    })
+    for k in sorted(SERVICES):
+        X[f"hist_{k}"] = hist[:, SERVICES.index(k)]
+    X["hist_total"] = hist.sum(axis=1)
+    # target correlacionado com o serviço mais usado (ou aleatório sem histórico)
+    top = np.where(hist.sum(axis=1) > 0, hist.argmax(axis=1), rng.integers(0, len(SERVICES), n))
+    y = np.array(SERVICES, dtype=object)[np.where(rng.random(n) < 0.7, top, rng.integers(0, len(SERVICES), n))]
+    return X, y
+
+def payloads(X: pd.DataFrame, n: int) -> list:
+    out = []
+    for r in X.head(n).itertuples(index=False):
+        d = r._asdict()
+        out.append(reco.PredictRequest(
+            client_info=reco.ClientInfo(**{k: d[k] for k in reco.ClientInfo.model_fields}),
+            vehicle_info=reco.VehicleInfo(idade_veiculo=d["idade_veiculo"]),
+            history_counts={k: int(d[f"hist_{k}"]) for k in SERVICES}))
+    return out
+
+def install_model(tenant_id: str, X: pd.DataFrame, y, compiled: bool) -> None:
+    blob = reco._fit_pipeline(X, y)[0]
+    model = reco.LoadedModel.from_pipeline(1, reco.joblib.load(reco.io.BytesIO(blob)), list(X.columns))
+    if not compiled:
+        model.scorer = None
+    reco.predict_cache = reco.PredictionCache(0)  # sem cache de predições: toda chamada chega ao scorer/batcher
+    reco.model_cache.invalidate()
+    reco.model_cache.staleness_s = float("inf")  # nunca consulta o banco (db=None)
+    reco.model_cache.put(tenant_id, model)
+    reco.model_cache.set_active(tenant_id, model.model_id)
+
+async def run(reqs: list, concurrency: int, microbatch: bool) -> dict:
+    reco.PREDICT_MICROBATCH = microbatch
+    latencies: list[float] = []
+    it = iter(reqs)
+
+    async def client():
+        for payload in it:
+            t0 = time.perf_counter()
+            await reco.ml_predict(payload, tenant_id="bench", db=None, user=None)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    lat = np.array(latencies) * 1000
+    return {"microbatch": microbatch, "requests": len(lat), "p50_ms": round(float(np.percentile(lat, 50)), 3),
+            "p99_ms": round(float(np.percentile(lat, 99)), 3), "throughput_rps": round(len(lat) / wall, 1)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--window-ms", type=float, default=reco.PREDICT_MICROBATCH_WINDOW_MS)
+    ap.add_argument("--max-batch", type=int, default=reco.PREDICT_MICROBATCH_MAX)
+    ap.add_argument("--pipeline", action="store_true", help="desliga o scorer compilado")
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    X, y = synthetic_examples(max(args.requests, 5000))
+    install_model("bench", X, y, compiled=not args.pipeline)
+    reqs = payloads(X, args.requests)
+    reco.predict_batcher = reco.PredictMicroBatcher(args.window_ms / 1000, args.max_batch)
+
+    async def both():
+        return [await run(reqs, args.concurrency, False), await run(reqs, args.concurrency, True)]
+
+    results = asyncio.run(both())
+    print(json.dumps({"scorer": "pipeline" if args.pipeline else "compiled", "concurrency": args.concurrency,
+                      "window_ms": args.window_ms, "max_batch": args.max_batch,
+                      "results": results, "batcher": reco.predict_batcher.stats()}, indent=2))
+
+if __name__ == "__main__":
+    main()
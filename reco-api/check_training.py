@@ -0,0 +1,201 @@
+"""
+Verificação da matriz de treino e do artefato compacto (offline, sem banco nem HTTP).
+
+Gera um dataset sintético (linhas repetidas, serviços fora de DEFAULT_SERVICES
+e uma coluna hist_* com chave a normalizar), grava em CSV, JSONL, NPZ e
+Parquet (se houver pyarrow) e, para cada formato, compara com a referência
+em pandas/sklearn:
+
+  - TrainingMatrix.design() × ColumnTransformer(OneHotEncoder + passthrough)
+  - TrainingMatrix.dedupe() × value_counts() (linhas únicas e pesos)
+  - content_hash igual em todos os formatos (mesmas linhas, mesma ordem)
+  - o mesmo arquivo do transform_csv.py (cabeçalhos HIST_*, --dataset) enviado
+    como CSV e como NPZ/Parquet dá a mesma matriz e o mesmo hash
+  - artefato .rclr (f8/f4) gravado e relido pelo ArtifactStore × pipe.predict_proba
+
+Imprime uma linha por verificação e sai com código 1 se alguma falhar.
+
+    python check_training.py
+    python check_training.py --rows 20000 --seed 3
+    python check_training.py --dataset outro_dataset.csv
+"""
+import argparse, io, json, sys, tempfile, warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+import app as reco
+from bench_microbatch import synthetic_examples
+
+failures: list[str] = []
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    print(f"{'ok    ' if ok else 'FALHOU'} {name}" + (f" ({detail})" if detail else ""))
+    if not ok:
+        failures.append(name)
+
+def dense(a) -> np.ndarray:
+    return a.toarray() if sparse.issparse(a) else np.asarray(a)
+
+# ---------- dados ----------
+def dataset(n: int, seed: int) -> pd.DataFrame:
+    """Colunas do dataset.csv + target_service, sem hist_total (o parser CSV o leria como serviço)."""
+    X, y = synthetic_examples(n, seed)
+    df = X.drop(columns="hist_total").assign(target_service=y)
+    rng = np.random.default_rng(seed)
+    df.loc[rng.random(n) < 0.05, "tipo_cliente"] = "Órgão Público"
+    df["hist_Segunda Via"] = np.where(np.arange(n) % 11 == 0, 2, 0)  # chave normalizada para SEGUNDA_VIA
+    # ~20% de linhas repetidas para o dedupe ter o que juntar
+    return pd.concat([df, df.sample(n // 5, random_state=seed)], ignore_index=True)
+
+def hist_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if c.startswith("hist_")]
+
+def to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode()
+
+def to_jsonl(df: pd.DataFrame) -> bytes:
+    """Um OfferExample por linha; history_counts só com as contagens não nulas."""
+    hist = hist_columns(df)
+    lines = []
+    for r in df.to_dict("records"):
+        lines.append(json.dumps({
+            "client_info": {"tipo_cliente": r["tipo_cliente"], **{c: r[c] for c in reco.BASE_FEATURES if c != "idade_veiculo"}},
+            "vehicle_info": {"idade_veiculo": r["idade_veiculo"]},
+            "history_counts": {c[5:]: r[c] for c in hist if r[c]},
+            "target_service": r["target_service"],
+        }, ensure_ascii=False))
+    return "\n".join(lines).encode()
+
+def to_npz(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    np.savez(buf, **{c: df[c].to_numpy().astype(str) if df[c].dtype == object else df[c].to_numpy() for c in df.columns})
+    return buf.getvalue()
+
+def to_parquet(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+def sources(df: pd.DataFrame) -> dict:
+    out = {"csv": (reco.parse_csv_upload, to_csv(df)), "jsonl": (reco.parse_jsonl_upload, to_jsonl(df)),
+           "npz": (reco.parse_npz_upload, to_npz(df))}
+    try:
+        import pyarrow  # noqa: F401
+        out["parquet"] = (reco.parse_parquet_upload, to_parquet(df))
+    except ImportError:
+        print("pyarrow ausente: parquet não verificado")
+    return out
+
+# ---------- referência pandas/sklearn ----------
+def reference(df: pd.DataFrame, feature_cols: list[str]) -> tuple[pd.DataFrame, np.ndarray]:
+    """Frame nas colunas do modelo (chaves hist_* normalizadas, ausentes = 0) e y normalizado."""
+    ref = df.rename(columns={c: "hist_" + reco.normalize_key(c[5:]) for c in hist_columns(df)})
+    ref["hist_total"] = ref[hist_columns(ref)].sum(axis=1)
+    y = ref["target_service"].map(reco.normalize_key).to_numpy(dtype=object)
+    return ref.reindex(columns=feature_cols, fill_value=0), y
+
+def expected_cols(df: pd.DataFrame) -> list[str]:
+    keys = {reco.normalize_key(c[5:]) for c in hist_columns(df)} | set(reco.DEFAULT_SERVICES)
+    return ["tipo_cliente", *reco.BASE_FEATURES, *(f"hist_{k}" for k in sorted(keys)), "hist_total"]
+
+def to_frame(X: reco.TrainingMatrix) -> pd.DataFrame:
+    """TrainingMatrix de volta para DataFrame em feature_cols (valores brutos, sem one-hot)."""
+    out = pd.DataFrame({"tipo_cliente": np.asarray(X.categories, dtype=object)[X.tipo], **X.base})
+    hist = dense(X.hist)
+    for j, k in enumerate(X.hist_keys):
+        out[f"hist_{k}"] = hist[:, j]
+    out["hist_total"] = X.hist_total
+    return out[X.feature_cols]
+
+def check_matrix(name: str, df: pd.DataFrame, X: reco.TrainingMatrix, y: np.ndarray) -> None:
+    check(f"{name}: feature_cols", X.feature_cols == expected_cols(df))
+    ref, y_ref = reference(df, X.feature_cols)
+    check(f"{name}: y", np.array_equal(y, y_ref))
+
+    ct = ColumnTransformer([("cat", OneHotEncoder(handle_unknown="ignore"), ["tipo_cliente"])],
+                           remainder="passthrough", sparse_threshold=0)
+    want, got = ct.fit_transform(ref), dense(X.design())
+    check(f"{name}: categories", X.categories == [str(c) for c in ct.named_transformers_["cat"].categories_[0]])
+    check(f"{name}: design × ColumnTransformer", want.shape == got.shape and np.array_equal(want, got),
+          f"{got.shape}, {X.hist.nnz} valores hist não nulos")
+
+    Xu, yu, w = X.dedupe(y)
+    want_w = ref.assign(_y=y_ref).value_counts(sort=False)
+    got_w = pd.Series(w, index=pd.MultiIndex.from_frame(to_frame(Xu).assign(_y=yu)))
+    same = len(want_w) == len(got_w) and all(got_w.get(k) == v for k, v in want_w.items())
+    check(f"{name}: dedupe × value_counts", same and w.sum() == len(X), f"{len(X)} → {len(Xu)} linhas")
+
+def check_same_file(path: Path) -> None:
+    """CSV do transform_csv.py (HIST_*) × o mesmo conteúdo nos formatos tipados."""
+    data = path.read_bytes()
+    X, y = reco._parse_upload(reco.parse_csv_upload, io.BytesIO(data))
+    df = pd.read_csv(io.BytesIO(data))
+    typed = {"npz": (reco.parse_npz_upload, to_npz(df))}
+    try:
+        import pyarrow  # noqa: F401
+        typed["parquet"] = (reco.parse_parquet_upload, to_parquet(df))
+    except ImportError:
+        pass
+    n_hist = sum(reco._is_hist_column(c) for c in df.columns)
+    check(f"{path.name} csv: colunas HIST_*", len(X.hist_keys) >= n_hist and X.hist.nnz > 0,
+          f"{len(X.hist_keys)} serviços, {X.hist.nnz} valores não nulos")
+    for name, (parser, blob) in typed.items():
+        Xt, yt = reco._parse_upload(parser, io.BytesIO(blob))
+        same = (Xt.feature_cols == X.feature_cols and Xt.categories == X.categories and np.array_equal(yt, y)
+                and np.array_equal(dense(Xt.design()), dense(X.design())))
+        check(f"{path.name}: csv × {name}", same and Xt.content_hash(yt) == X.content_hash(y))
+
+# ---------- artefato ----------
+def check_artifact(df: pd.DataFrame, X: reco.TrainingMatrix, y: np.ndarray, label: str) -> None:
+    blob, _, feature_cols, _, _ = reco._fit_pipeline(X, y)
+    model = reco.LoadedModel.from_pipeline(1, joblib.load(io.BytesIO(blob)), feature_cols)
+    ref, _ = reference(df, feature_cols)
+    want = model.pipe.predict_proba(ref)
+    items = [reco.PredictRequest.model_validate({k: v for k, v in json.loads(line).items() if k != "target_service"})
+             for line in to_jsonl(df).splitlines()]
+    with tempfile.TemporaryDirectory() as root:
+        store = reco.ArtifactStore(root)
+        for model_id, (dt, tol) in enumerate((("f8", 1e-12), ("f4", 1e-4)), start=1):
+            store.write_artifact("check", model_id, model.scorer.to_artifact(feature_cols, dt))
+            loaded = store.load("check", model_id)
+            same = (loaded is not None and loaded.classes == model.classes and loaded.feature_cols == model.feature_cols
+                    and loaded.schema == model.schema)
+            diff = np.abs(loaded.predict_encoded(*loaded.schema.encode(items)) - want).max() if same else np.inf
+            check(f"artefato {label} {dt}: round-trip × pipe.predict_proba", same and diff <= tol, f"máx. diferença {diff:.2e}")
+            del loaded  # solta o mmap antes de apagar o diretório
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dataset", type=Path, default=Path(__file__).resolve().parent / "dataset.csv",
+                    help="saída do transform_csv.py (pulado se não existir)")
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = dataset(args.rows, args.seed)
+    parsed = {name: reco._parse_upload(parser, io.BytesIO(data)) for name, (parser, data) in sources(df).items()}
+    for name, (X, y) in parsed.items():
+        check_matrix(name, df, X, y)
+
+    hashes = {name: X.content_hash(y) for name, (X, y) in parsed.items()}
+    check("content_hash igual em " + ", ".join(hashes), len(set(hashes.values())) == 1, next(iter(hashes.values()))[:16])
+
+    if args.dataset.exists():
+        check_same_file(args.dataset)
+
+    X, y = parsed["csv"]
+    check_artifact(df, X, y, "multiclasse")
+    check_artifact(df, X, np.where(y == y[0], y[0], "OUTRO"), "binário")
+
+    print(f"{len(failures)} falha(s)" if failures else "tudo ok")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Retreino em lote dos tenants a partir do histórico de processos (ex.: cron).
+
+Para cada tenant monta a matriz de treino com `history_training_matrix` (um
+exemplo por processo, com as features do cliente antes dele), ajusta os
+modelos em paralelo num process pool e grava os resultados em transações de
+`--write-batch` modelos (mesma rotina do POST /admin/retrain). Imprime um JSON
+com tempos e falhas por tenant.
+
+    python retrain_all.py --all                       # todos os tenants, pool = nº de CPUs
+    python retrain_all.py --tenant demo --tenant acme --workers 4
+"""
+import argparse, asyncio, json
+
+import app as reco
+
+async def run(domains: list[str], workers: int, write_batch: int, min_rows: int) -> dict:
+    await reco.startup()  # garante registro / colunas novas mesmo sem a API ter subido
+    try:
+        async with reco.SessionLocal() as db:
+            tenants = await reco.list_tenants(db, domains or None)
+        summary = await reco.retrain_tenants([t for _, t in tenants], workers, write_batch, min_rows)
+        domain_of = {t: d for d, t in tenants}
+        for r in summary["results"]:
+            r["domain"] = domain_of[r["tenant_id"]]
+        return summary
+    finally:
+        await reco.engine.dispose()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tenant", action="append", default=[], help="domínio do tenant (repetível)")
+    ap.add_argument("--all", action="store_true", help="todos os tenants")
+    ap.add_argument("--workers", type=int, default=reco.RETRAIN_WORKERS, help="processos de treino (0 = nº de CPUs)")
+    ap.add_argument("--write-batch", type=int, default=reco.RETRAIN_WRITE_BATCH, help="modelos gravados por transação")
+    ap.add_argument("--min-rows", type=int, default=reco.RETRAIN_MIN_ROWS, help="mínimo de processos para treinar")
+    args = ap.parse_args()
+    if not args.tenant and not args.all:
+        ap.error("informe --tenant ou --all")
+    try:
+        summary = asyncio.run(run(args.tenant, args.workers, args.write_batch, args.min_rows))
+    except reco.HTTPException as e:
+        raise SystemExit(e.detail)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
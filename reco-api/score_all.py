@@ -0,0 +1,53 @@
+"""
+Job em lote das recomendações pré-calculadas (ex.: cron noturno).
+
+Para cada tenant pontua todos os clientes com o modelo ativo e regrava o
+top-N em `ml_recommendations` (mesma rotina do POST /ml/recommendations/score).
+Imprime um JSON com o resumo de cada tenant.
+
+    python score_all.py --tenant demo            # um ou mais domínios
+    python score_all.py --all --top-n 5          # todos os tenants com modelo
+"""
+import argparse, asyncio, json
+
+from sqlalchemy import select
+
+import app as reco
+
+async def tenant_ids(domains: list[str], all_tenants: bool) -> list[tuple[str, str]]:
+    async with reco.SessionLocal() as db:
+        if all_tenants:
+            stmt = (select(reco.Tenant.domain, reco.Tenant.id)
+                    .where(reco.Tenant.id.in_(select(reco.MlModel.tenant_id).distinct())).order_by(reco.Tenant.domain))
+        else:
+            stmt = select(reco.Tenant.domain, reco.Tenant.id).where(reco.Tenant.domain.in_(domains))
+        found = [(d, t) for d, t in (await db.execute(stmt)).all()]
+    missing = set(domains) - {d for d, _ in found}
+    if missing:
+        raise SystemExit(f"Tenant(s) não encontrado(s): {', '.join(sorted(missing))}")
+    return found
+
+async def run(domains: list[str], all_tenants: bool, top_n: int) -> list[dict]:
+    await reco.startup()  # garante ml_recommendations / registro mesmo sem a API ter subido
+    out = []
+    for domain, tenant_id in await tenant_ids(domains, all_tenants):
+        async with reco.SessionLocal() as db:
+            try:
+                out.append({"domain": domain, **(await reco.score_tenant(db, tenant_id, top_n))})
+            except reco.HTTPException as e:
+                out.append({"domain": domain, "tenant_id": tenant_id, "error": e.detail})
+    await reco.engine.dispose()
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tenant", action="append", default=[], help="domínio do tenant (repetível)")
+    ap.add_argument("--all", action="store_true", help="todos os tenants que têm modelo treinado")
+    ap.add_argument("--top-n", type=int, default=reco.RECO_TOP_N)
+    args = ap.parse_args()
+    if not args.tenant and not args.all:
+        ap.error("informe --tenant ou --all")
+    print(json.dumps(asyncio.run(run(args.tenant, args.all, args.top_n)), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
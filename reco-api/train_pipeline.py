@@ -15,7 +15,7 @@ print("Transform finalizado. Gerado:", FINAL)
 # 2) Enviar para API e treinar
 print("\n>> ENVIANDO PARA TREINAMENTO...")
 
-url = "http://127.0.0.1:8020/ml/train/import?tenant=demo&fmt=csv"
+url = "http://127.0.0.1:8020/ml/train/import?tenant=demo&fmt=csv&wait=true"
 
 with open(FINAL, "rb") as f:
     r = requests.post(
@@ -1,4 +1,5 @@
 import argparse, unicodedata, csv
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
@@ -23,67 +24,152 @@ def to_float(x):
     except Exception:
         return 0.0
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="inp", required=True)
-    ap.add_argument("--out", dest="outp", default="dataset.csv")
-    ap.add_argument("--mode", choices=["positives","all"], default="positives")
-    args = ap.parse_args()
+def convert(s: pd.Series, fn) -> pd.Series:
+    """Mesmo resultado de `s.apply(fn)`, chamando `fn` uma vez por valor distinto.
 
-    df = pd.read_csv(Path(args.inp), dtype=str)
+    Exportações repetem muito os mesmos valores (contagens, tipos, serviços), então
+    factorize + take troca o try/except por célula por um por valor único.
+    """
+    codes, uniques = pd.factorize(s)  # nulos → código -1 (último item de `values`)
+    values = pd.Series([fn(u) for u in uniques] + [fn(np.nan)]).to_numpy()
+    return pd.Series(values[codes], index=s.index)
+
+def to_number(s: pd.Series, integer: bool) -> pd.Series:
+    """Versão vetorizada de `to_int`/`to_float` para uma coluna inteira.
+
+    `astype(float64)` usa o mesmo parser do `float()` do Python ("1_000", " 12 ",
+    "1e3", "inf"), então o resultado é idêntico. A troca de vírgula só roda se a
+    coluna tiver alguma (float() nunca aceita vírgula); se ainda sobrar célula que
+    não é número (ou inteiro fora do int64) cai no `convert`, com a função original.
+    """
+    fn = to_int if integer else to_float
+    try:
+        vals = s.astype("float64")
+    except (ValueError, TypeError):
+        try:
+            vals = s.str.replace(",", ".", regex=False).astype("float64")
+        except (ValueError, TypeError):
+            return convert(s, fn)
+    vals[s.isna()] = 0.0  # célula vazia → 0; a string "nan" continua NaN em to_float
+    if not integer:
+        return vals
+    vals = vals.where(np.isfinite(vals), 0.0)  # int(float("nan"/"inf")) falha → 0
+    if (vals.abs() >= 2.0**63).any():
+        return convert(s, fn)
+    return vals.astype("int64")  # trunca em direção a zero, como int()
+
+REQUIRED = ["TIPO_CLIENTE","TOTAL_SERVICOS_CLIENTE","VALOR_TOTAL_GASTO",
+            "DIAS_DESDE_ULTIMO_SERVICO","SERVICOS_UNICOS_UTILIZADOS","IDADE_VEICULO"]
+RENAME = {
+    "TIPO_CLIENTE":"tipo_cliente",
+    "TOTAL_SERVICOS_CLIENTE":"total_servicos_cliente",
+    "VALOR_TOTAL_GASTO":"valor_total_gasto",
+    "DIAS_DESDE_ULTIMO_SERVICO":"dias_desde_ultimo_servico",
+    "SERVICOS_UNICOS_UTILIZADOS":"servicos_unicos_utilizados",
+    "IDADE_VEICULO":"idade_veiculo",
+    "TARGET_SERVICE":"target_service"
+}
+
+def transform(df: pd.DataFrame, mode: str) -> pd.DataFrame:
+    """Planilha bruta (tudo str) → dataset de treino; aplicável ao arquivo inteiro ou a cada chunk."""
     df.columns = [norm_text(c) for c in df.columns]
 
     # obrigatórias
-    req = ["TIPO_CLIENTE","TOTAL_SERVICOS_CLIENTE","VALOR_TOTAL_GASTO",
-           "DIAS_DESDE_ULTIMO_SERVICO","SERVICOS_UNICOS_UTILIZADOS","IDADE_VEICULO"]
-    miss = [c for c in req if c not in df.columns]
+    miss = [c for c in REQUIRED if c not in df.columns]
     if miss:
         raise SystemExit(f"Colunas obrigatorias ausentes: {miss}")
 
     # numéricos
-    df["TOTAL_SERVICOS_CLIENTE"] = df["TOTAL_SERVICOS_CLIENTE"].apply(to_int)
-    df["VALOR_TOTAL_GASTO"] = df["VALOR_TOTAL_GASTO"].apply(to_float)
-    df["DIAS_DESDE_ULTIMO_SERVICO"] = df["DIAS_DESDE_ULTIMO_SERVICO"].apply(to_int)
-    df["SERVICOS_UNICOS_UTILIZADOS"] = df["SERVICOS_UNICOS_UTILIZADOS"].apply(to_int)
-    df["IDADE_VEICULO"] = df["IDADE_VEICULO"].apply(to_int)
+    df["TOTAL_SERVICOS_CLIENTE"] = to_number(df["TOTAL_SERVICOS_CLIENTE"], integer=True)
+    df["VALOR_TOTAL_GASTO"] = to_number(df["VALOR_TOTAL_GASTO"], integer=False)
+    df["DIAS_DESDE_ULTIMO_SERVICO"] = to_number(df["DIAS_DESDE_ULTIMO_SERVICO"], integer=True)
+    df["SERVICOS_UNICOS_UTILIZADOS"] = to_number(df["SERVICOS_UNICOS_UTILIZADOS"], integer=True)
+    df["IDADE_VEICULO"] = to_number(df["IDADE_VEICULO"], integer=True)
 
     # COUNT_* -> HIST_*
     for c in list(df.columns):
         if c.startswith("COUNT_"):
             suffix = norm_text(c[len("COUNT_"):])
-            df[f"HIST_{suffix}"] = df[c].apply(to_int)
+            df[f"HIST_{suffix}"] = to_number(df[c], integer=True)
 
     for h in ["HIST_LICENCIAMENTO","HIST_VISTORIA","HIST_TRANSFERENCIA","HIST_DESBLOQUEIOS"]:
         if h not in df.columns: df[h] = 0
 
     # target_service a partir de SERVICO_OFERTADO + ACEITOU
     if "SERVICO_OFERTADO" in df.columns and "ACEITOU" in df.columns:
-        df["_SVC"] = df["SERVICO_OFERTADO"].apply(norm_text)
-        df["_OK"]  = df["ACEITOU"].apply(to_int)
-        if args.mode == "positives":
+        df["_SVC"] = convert(df["SERVICO_OFERTADO"], norm_text)
+        df["_OK"]  = to_number(df["ACEITOU"], integer=True)
+        if mode == "positives":
             df = df[df["_OK"] == 1].copy()
             df["TARGET_SERVICE"] = df["_SVC"]
         else:
-            df["TARGET_SERVICE"] = df.apply(lambda r: r["_SVC"] if r["_OK"]==1 else "", axis=1)
+            df["TARGET_SERVICE"] = df["_SVC"].where(df["_OK"] == 1, "")
     elif "TARGET_SERVICE" not in df.columns:
         raise SystemExit("Faltam SERVICO_OFERTADO/ACEITOU ou TARGET_SERVICE no CSV.")
 
-    out_cols = [
-        "TIPO_CLIENTE","TOTAL_SERVICOS_CLIENTE","VALOR_TOTAL_GASTO",
-        "DIAS_DESDE_ULTIMO_SERVICO","SERVICOS_UNICOS_UTILIZADOS","IDADE_VEICULO"
-    ] + [c for c in df.columns if c.startswith("HIST_")] + ["TARGET_SERVICE"]
-
-    df_out = df[out_cols].rename(columns={
-        "TIPO_CLIENTE":"tipo_cliente",
-        "TOTAL_SERVICOS_CLIENTE":"total_servicos_cliente",
-        "VALOR_TOTAL_GASTO":"valor_total_gasto",
-        "DIAS_DESDE_ULTIMO_SERVICO":"dias_desde_ultimo_servico",
-        "SERVICOS_UNICOS_UTILIZADOS":"servicos_unicos_utilizados",
-        "IDADE_VEICULO":"idade_veiculo",
-        "TARGET_SERVICE":"target_service"
-    })
-    df_out.to_csv(Path(args.outp), index=False, quoting=csv.QUOTE_MINIMAL, encoding="utf-8")
-    print(f"OK! Gerado: {args.outp} (linhas: {len(df_out)})")
+    out_cols = REQUIRED + [c for c in df.columns if c.startswith("HIST_")] + ["TARGET_SERVICE"]
+    return df[out_cols].rename(columns=RENAME)
+
+class ColumnarWriter:
+    """Saída colunar opcional (.parquet ou .arrow/.feather); pyarrow só é importado se usado."""
+
+    def __init__(self, path: Path):
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq, pyarrow.ipc as ipc
+        except ImportError:
+            raise SystemExit("Saída colunar requer pyarrow (pip install pyarrow)")
+        self.pa, self.pq, self.ipc = pa, pq, ipc
+        self.path, self.writer, self.schema = path, None, None
+        self.parquet = path.suffix.lower() == ".parquet"
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.schema is None:
+            # schema fixo pelo 1º chunk: texto em tipo/target, float no valor, int64 no resto
+            pa = self.pa
+            self.schema = pa.schema([(c, pa.string() if c in ("tipo_cliente", "target_service")
+                                      else pa.float64() if c == "valor_total_gasto" else pa.int64()) for c in df.columns])
+            if self.parquet:
+                self.writer = self.pq.ParquetWriter(self.path, self.schema)
+            else:
+                self.writer = self.ipc.new_file(self.path, self.schema)
+        try:
+            table = self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        except (self.pa.ArrowException, OverflowError) as e:
+            raise SystemExit(f"Saída colunar: valor fora do tipo da coluna ({e})")
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True)
+    ap.add_argument("--out", dest="outp", default="dataset.csv")
+    ap.add_argument("--mode", choices=["positives","all"], default="positives")
+    ap.add_argument("--chunksize", type=int, default=0,
+                    help="processa N linhas por vez (memória constante para exportações grandes)")
+    ap.add_argument("--columnar", dest="columnar", default=None,
+                    help="grava também em Parquet (.parquet) ou Arrow IPC (.arrow/.feather)")
+    args = ap.parse_args()
+
+    chunks = pd.read_csv(Path(args.inp), dtype=str, chunksize=args.chunksize if args.chunksize > 0 else None)
+    if args.chunksize <= 0:
+        chunks = [chunks]  # sem --chunksize: o arquivo inteiro de uma vez (comportamento original)
+    columnar = ColumnarWriter(Path(args.columnar)) if args.columnar else None
+    total = 0
+    try:
+        for i, chunk in enumerate(chunks):
+            df_out = transform(chunk, args.mode)
+            df_out.to_csv(Path(args.outp), index=False, quoting=csv.QUOTE_MINIMAL, encoding="utf-8",
+                          mode="w" if i == 0 else "a", header=i == 0)
+            if columnar is not None:
+                columnar.write(df_out)
+            total += len(df_out)
+    finally:
+        if columnar is not None:
+            columnar.close()
+    print(f"OK! Gerado: {args.outp} (linhas: {total})")
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,8 @@ import jwt from 'jsonwebtoken';
 
 const ML_API_URL = process.env.ML_API_URL || 'http://localhost:8020';
 const NEXTAUTH_SECRET = process.env.NEXTAUTH_SECRET!;
+// Idade máxima (segundos) da recomendação pré-calculada; acima disso usa a predição ao vivo
+const ML_RECOMMENDATION_MAX_AGE_S = Number(process.env.ML_RECOMMENDATION_MAX_AGE_S || 3600);
 
 export async function GET(
   req: NextRequest,
@@ -20,62 +22,6 @@ export async function GET(
 
     const { customerId } = await params;
 
-    // Buscar cliente com histórico
-    const customer = await prisma.customer.findUnique({
-      where: { id: customerId },
-      include: {
-        veiculos: true,
-        processes: {
-          orderBy: { createdAt: 'desc' },
-          take: 20,
-        },
-      },
-    });
-
-    if (!customer) {
-      return NextResponse.json({ error: 'Cliente não encontrado' }, { status: 404 });
-    }
-
-    // Preparar dados para ML
-    const historyCounts: Record<string, number> = {};
-    let valorTotalGasto = 0;
-    let ultimaData: Date | null = null;
-
-    customer.processes.forEach((proc) => {
-      const service = proc.tipoServico || 'OUTROS';
-      historyCounts[service] = (historyCounts[service] || 0) + 1;
-      valorTotalGasto += proc.valorTotal || 0;
-
-      if (!ultimaData || proc.dataInicio > ultimaData) {
-        ultimaData = proc.dataInicio;
-      }
-    });
-
-    const totalServicos = customer.processes.length;
-    const servicosUnicos = Object.keys(historyCounts).length;
-    const diasDesdeUltimo = ultimaData
-      ? Math.floor((Date.now() - new Date(ultimaData).getTime()) / (1000 * 60 * 60 * 24))
-      : 999;
-
-    const vehicle = customer.veiculos[0];
-    const idadeVeiculo = vehicle ? new Date().getFullYear() - vehicle.ano : 5;
-
-    const predictRequest = {
-      client_info: {
-        tipo_cliente: customer.tipoCliente || 'FISICO',
-        total_servicos_cliente: totalServicos,
-        valor_total_gasto: valorTotalGasto,
-        dias_desde_ultimo_servico: diasDesdeUltimo,
-        servicos_unicos_utilizados: servicosUnicos,
-      },
-      vehicle_info: {
-        ano_veiculo: vehicle?.ano || 2020,
-        tipo_veiculo: 'AUTOMOVEL',
-        idade_veiculo: idadeVeiculo,
-      },
-      history_counts: historyCounts,
-    };
-
     // Gerar token JWT
     const token = jwt.sign(
       { sub: session.user.id, email: session.user.email },
@@ -91,15 +37,29 @@ export async function GET(
 
     const tenantDomain = user?.tenant.domain || 'demo';
 
-    // Fazer predição
-    const mlResponse = await fetch(`${ML_API_URL}/ml/predict?tenant=${tenantDomain}`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${token}`,
-      },
-      body: JSON.stringify(predictRequest),
-    });
+    // Recomendação pré-calculada pelo job em lote (uma leitura indexada)
+    const precomputed = await fetch(
+      `${ML_API_URL}/ml/recommendations/${encodeURIComponent(customerId)}?tenant=${tenantDomain}`,
+      { headers: { 'Authorization': `Bearer ${token}` } }
+    ).catch(() => null);
+
+    if (precomputed?.ok) {
+      const recommendation = await precomputed.json();
+      // Lote velho ou de outro modelo não reflete processos novos do cliente: cai para a predição ao vivo
+      if (recommendation.active_model && recommendation.age_s <= ML_RECOMMENDATION_MAX_AGE_S) {
+        return NextResponse.json(recommendation);
+      }
+    }
+
+    // Predição ao vivo: a reco-api agrega processos/veículos do cliente direto no banco
+    const mlResponse = await fetch(
+      `${ML_API_URL}/ml/predict/customer/${encodeURIComponent(customerId)}?tenant=${tenantDomain}`,
+      { headers: { 'Authorization': `Bearer ${token}` } }
+    );
+
+    if (mlResponse.status === 404) {
+      return NextResponse.json({ error: 'Cliente não encontrado' }, { status: 404 });
+    }
 
     if (!mlResponse.ok) {
       const error = await mlResponse.text();
@@ -16,7 +16,7 @@ function generateMLToken(userId: string, email: string) {
 
 /**
  * POST /api/ml/train/import
- * Treina o modelo ML importando CSV ou JSONL
+ * Treina o modelo ML importando CSV, JSONL ou colunar (parquet, arrow, npz)
  */
 export async function POST(req: NextRequest) {
   try {
@@ -52,7 +52,7 @@ export async function POST(req: NextRequest) {
     const mlFormData = new FormData();
     mlFormData.append('file', file);
 
-    const response = await fetch(`${ML_API_URL}/ml/train/import?tenant=${tenantSlug}&fmt=${fmt}`, {
+    const response = await fetch(`${ML_API_URL}/ml/train/import?tenant=${tenantSlug}&fmt=${fmt}&wait=true`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
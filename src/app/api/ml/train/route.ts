@@ -38,7 +38,7 @@ export async function POST(req: NextRequest) {
     // Forward request para ML API
     const body = await req.json();
     
-    const response = await fetch(`${ML_API_URL}/ml/train?tenant=${tenantSlug}`, {
+    const response = await fetch(`${ML_API_URL}/ml/train?tenant=${tenantSlug}&wait=true`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,